@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+# Misst die Startzeit von fahrstrassen.py: Wandzeit pro Modus fuer ein minimales Modul im Vergleich
+# zu einer aelteren Revision sowie die langsamsten Importe laut "python -X importtime".
+
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+MODUL = """<?xml version="1.0" encoding="UTF-8"?>
+<Zusi><Strecke>
+<ReferenzElemente ReferenzNr="1" StrElement="1" StrNorm="1" RefTyp="4" Info="Signal: A S1"/>
+<ReferenzElemente ReferenzNr="2" StrElement="2" StrNorm="1" RefTyp="4" Info="Signal: A S2"/>
+<StrElement Nr="1"><InfoNormRichtung><Signal NameBetriebsstelle="A" Signalname="S1"><HsigBegriff HsigGeschw="0"/><HsigBegriff HsigGeschw="16.67" FahrstrTyp="4"/><VsigBegriff VsigGeschw="0"/><MatrixEintrag Signalbild="1"/><MatrixEintrag Signalbild="2"/></Signal></InfoNormRichtung><NachNorm Nr="2"/></StrElement>
+<StrElement Nr="2"><InfoNormRichtung><Signal NameBetriebsstelle="A" Signalname="S2"><HsigBegriff HsigGeschw="0"/><VsigBegriff VsigGeschw="0"/><MatrixEintrag Signalbild="1"/></Signal></InfoNormRichtung><NachGegen Nr="1"/></StrElement>
+<Fahrstrasse FahrstrName="A S1 -> A S2" FahrstrTyp="TypZug" Laenge="100"><FahrstrStart Ref="1"/><FahrstrZiel Ref="2"/><FahrstrSignal Ref="1" FahrstrSignalZeile="1"/></Fahrstrasse>
+</Strecke></Zusi>
+"""
+
+MODI = [
+    ['--modus', 'fahrstrassen'],
+    ['--modus', 'liste'],
+    ['--modus', 'refpunkte'],
+    ['--modus', 'an_signal', '--signal', 'S1'],
+    ['--modus', 'konflikte'],
+]
+
+parser = argparse.ArgumentParser(description='Startzeit-Benchmark fuer fahrstrassen.py.')
+parser.add_argument('--wiederholungen', type=int, default=20, help="Anzahl Aufrufe pro Modus")
+parser.add_argument('--importe', type=int, default=15, help="Anzahl der langsamsten Importe, die ausgegeben werden")
+parser.add_argument('--vergleich', default='8b851dc', help="Git-Revision, mit der verglichen wird (Standard: Stand vor den Startzeit-Optimierungen; leer = kein Vergleich)")
+args = parser.parse_args()
+
+repo = os.path.dirname(os.path.abspath(__file__))
+skript = os.path.join(repo, 'fahrstrassen.py')
+
+def skript_aus_revision(revision, verzeichnis):
+    """
+    Entpackt die Python-Dateien der Revision revision nach verzeichnis und gibt den Pfad von fahrstrassen.py zurueck.
+    """
+    archiv = subprocess.run(['git', '-C', repo, 'archive', '--format=tar', revision], stdout=subprocess.PIPE, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archiv)) as tar:
+        tar.extractall(verzeichnis, members=[m for m in tar.getmembers() if m.name.endswith('.py')])
+    return os.path.join(verzeichnis, 'fahrstrassen.py')
+
+def unterstuetzte_modi(skript, env):
+    """
+    Gibt die Modi zurueck, die skript laut --help kennt.
+    """
+    hilfe = subprocess.run([sys.executable, skript, '--help'], env=env, stdout=subprocess.PIPE, universal_newlines=True, check=True).stdout
+    hilfe = " ".join(hilfe.split())
+    return set(modus[1] for modus in MODI if '"{}"'.format(modus[1]) in hilfe)
+
+def messen(skript, modul, modus, env):
+    """
+    Gibt die Wandzeiten (ms) von args.wiederholungen Aufrufen zurueck. Ein erster, nicht gemessener Aufruf
+    legt den Bytecode-Cache an.
+    """
+    subprocess.run([sys.executable, skript, modul] + modus, env=env, stdout=subprocess.DEVNULL, check=True)
+    zeiten = []
+    for _ in range(args.wiederholungen):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, skript, modul] + modus, env=env, stdout=subprocess.DEVNULL, check=True)
+        zeiten.append((time.perf_counter() - start) * 1000)
+    return zeiten
+
+with tempfile.TemporaryDirectory() as datenpfad:
+    os.makedirs(os.path.join(datenpfad, 'Routes'))
+    modul = os.path.join(datenpfad, 'Routes', 'benchmark.st3')
+    with open(modul, 'w') as f:
+        f.write(MODUL)
+
+    # Bytecode schreiben lassen, wie bei einem normalen Aufruf
+    env = dict(os.environ, ZUSI3_DATAPATH=datenpfad)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+    vergleich_skript = None
+    vergleich_modi = set()
+    if args.vergleich:
+        vergleich_skript = skript_aus_revision(args.vergleich, os.path.join(datenpfad, 'vergleich'))
+        vergleich_modi = unterstuetzte_modi(vergleich_skript, env)
+
+    print("Wandzeit fuer {} Aufrufe (ms), min / median:".format(args.wiederholungen))
+    print("   {:<30} {:>15} {:>15} {:>8}".format("", "aktuell", args.vergleich if args.vergleich else "", ""))
+    for modus in MODI:
+        zeiten = messen(skript, modul, modus, env)
+        zeile = " - {:<30} {:6.1f} / {:6.1f}".format(" ".join(modus), min(zeiten), statistics.median(zeiten))
+        if modus[1] in vergleich_modi:
+            zeiten_vergleich = messen(vergleich_skript, modul, modus, env)
+            zeile += " {:6.1f} / {:6.1f} {:+7.0f}%".format(min(zeiten_vergleich), statistics.median(zeiten_vergleich),
+                (statistics.median(zeiten) / statistics.median(zeiten_vergleich) - 1) * 100)
+        elif vergleich_skript is not None:
+            zeile += " {:>15}".format("(nicht vorh.)")
+        print(zeile)
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    print(" - {:<30} {:6.1f}".format("(python -c pass)", (time.perf_counter() - start) * 1000))
+
+    ergebnis = subprocess.run([sys.executable, '-X', 'importtime', skript, modul], env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+    # (kumulierte Zeit in us, Modulname)
+    importe = []
+    for zeile in ergebnis.stderr.splitlines():
+        if not zeile.startswith("import time:") or "cumulative" in zeile:
+            continue
+        (_, kumuliert, name) = zeile.split("|")
+        importe.append((int(kumuliert), name.rstrip()))
+
+    print("\nLangsamste Importe (kumuliert, ms):")
+    for kumuliert, name in sorted(importe, reverse=True)[:args.importe]:
+        print(" - {:6.1f} {}".format(kumuliert / 1000, name))
@@ -0,0 +1,1738 @@
+import xml.etree.ElementTree as ET
+import sys
+import os
+import io
+import argparse
+from collections import defaultdict, deque
+from functools import lru_cache
+
+# Wird durch termcolor.colored ersetzt, wenn auf ein Terminal ausgegeben wird (siehe main)
+def colored(s, *args, **kwargs):
+    return s
+
+import logging
+# logging.basicConfig(level = logging.DEBUG)
+
+path_insensitive_cache = {}
+
+# http://stackoverflow.com/a/8462613/1083696
+def path_insensitive(path):
+    """
+    Get a case-insensitive epath for use on a case sensitive system.
+    """
+    try:
+        return path_insensitive_cache[path]
+    except KeyError:
+        ret = _path_insensitive(path) or path
+        path_insensitive_cache[path] = ret
+        return ret
+
+def _path_insensitive(path):
+    """
+    Recursive part of path_insensitive to do the work.
+    """
+
+    if path == '' or os.path.exists(path):
+        return path
+
+    base = os.path.basename(path)  # may be a directory or a file
+    dirname = os.path.dirname(path)
+
+    suffix = ''
+    if not base:  # dir ends with a slash?
+        if len(dirname) < len(path):
+            suffix = path[:len(path) - len(dirname)]
+
+        base = os.path.basename(dirname)
+        dirname = os.path.dirname(dirname)
+
+    if not os.path.exists(dirname):
+        dirname = _path_insensitive(dirname)
+        if not dirname:
+            return
+
+    # at this point, the directory exists but not the file
+
+    try:  # we are expecting dirname to be a directory, but it could be a file
+        files = os.listdir(dirname)
+    except OSError:
+        return
+
+    baselow = base.lower()
+    try:
+        basefinal = next(fl for fl in files if fl.lower() == baselow)
+    except StopIteration:
+        return
+
+    if basefinal:
+        return os.path.join(dirname, basefinal) + suffix
+    else:
+        return
+
+all_ones = 2**64 - 1
+
+NORM = True
+GEGEN = False
+
+def str_el_ri(modul, element, richtung):
+    global dieses_modul
+    return "Element {}{}{}".format(
+        element.attrib.get("Nr", "0"),
+        'n' if richtung == NORM else 'g',
+        "" if modul == dieses_modul else "[{}]".format(os.path.basename(modul.replace('\\', os.sep))),
+    )
+
+class RefPunkt(object):
+    def __init__(self, modul, refnr, info, reftyp, element, richtung):
+        self.modul = modul
+        self.refnr = refnr
+        self.info = info
+        self.reftyp = reftyp
+        self.element = element
+        self.richtung = richtung
+
+    def __repr__(self):
+        global dieses_modul
+        return "Element {}{}{}".format(
+            self.element.attrib.get("Nr", "0"),
+            'n' if self.richtung == NORM else 'g',
+            "" if self.modul == dieses_modul else "[{}]".format(self.modul_kurz())
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, RefPunkt) and self.modul == other.modul and self.refnr == other.refnr
+
+    def __hash__(self):
+        return hash((self.modul, self.refnr))
+
+    def valid(self):
+        return self.element is not None
+
+    def modul_kurz(self):
+        return os.path.basename(self.modul.replace('\\', os.sep))
+
+    def el_r(self):
+        return (self.modul, self.element, self.richtung)
+
+    def signal(self):
+        return self.element.find("./Info" + ("Norm" if self.richtung == NORM else "Gegen") + "Richtung/Signal")
+
+str_geschw = lambda v : "oo<{:.0f}>".format(v) if v < 0 else "{:.0f}".format(v * 3.6)
+
+def geschw_min(v1, v2):
+    if v1 < 0:
+        return v2
+    if v2 < 0:
+        return v1
+    return min(v1, v2)
+
+def geschw_kleiner(v1, v2):
+    if v2 < 0:
+        return v1 >= 0
+    if v1 < 0:
+        return False
+    return v1 < v2
+
+def normalize_zusi_relpath(relpath):
+    return relpath.upper().replace('/', '\\')
+
+@lru_cache(maxsize=None)
+def get_zusi_datapath():
+    return os.environ.get("ZUSI3_DATAPATH", "")
+
+@lru_cache(maxsize=None)
+def get_zusi_datapath_official():
+    try:
+        return os.environ['ZUSI3_DATAPATH_OFFICIAL']
+    except KeyError:
+        return get_zusi_datapath()
+
+def get_zusi_relpath(realpath):
+    try:
+        candidate1 = os.path.relpath(realpath, get_zusi_datapath())
+    except ValueError:
+        candidate1 = None
+
+    try:
+        candidate2 = os.path.relpath(realpath, get_zusi_datapath_official())
+    except ValueError:
+        candidate2 = None
+
+    if candidate1 is None:
+        if candidate2 is None:
+            raise Exception("Kann {} nicht in Zusi-relativen Pfad umwandeln (Datenverzeichnis: {}, Datenverzeichnis offiziell: {})".format(realpath, get_zusi_datapath(), get_zusi_datapath_official()))
+        else:
+            return candidate2.replace('/', '\\')
+    else:
+        return candidate1.replace('/', '\\')
+
+def get_abspath(zusi_relpath):
+    zusi_relpath = zusi_relpath.lstrip('\\').strip().replace('\\', os.sep)
+    result = path_insensitive(os.path.join(get_zusi_datapath(), zusi_relpath))
+    if os.path.exists(result):
+        return result
+    return path_insensitive(os.path.join(get_zusi_datapath_official(), zusi_relpath))
+
+# {fehlendes Modul}
+missing = set()
+
+# Modul -> (Elementnummer -> <StrElement>-Knoten)
+streckenelemente = dict()
+
+# Modul -> (Referenznummer -> (<StrElement>-Knoten, {NORM, GEGEN}))
+referenzpunkte = dict()
+
+# Modul -> [<Fahrstrasse>-Knoten]
+fahrstrassen = dict()
+
+# Modul -> [Modulname]
+nachbarmodule = dict()
+
+def lade_modul(zusi_relpath):
+    tree = ET.parse(get_abspath(zusi_relpath))
+    # Elementnummer -> <StrElement>-Knoten
+    streckenelemente[zusi_relpath] = dict(
+        (int(s.attrib.get("Nr", 0)), s)
+        for s in tree.findall("./Strecke/StrElement")
+    )
+    referenzpunkte[zusi_relpath] = dict(
+        (int(r.attrib.get("ReferenzNr", 0)), (streckenelemente[zusi_relpath][int(r.attrib.get("StrElement", 0))], NORM if int(r.attrib.get("StrNorm", 0)) == 1 else GEGEN, int(r.attrib.get("RefTyp", 0)), r.attrib.get("Info", "")))
+        for r in tree.findall("./Strecke/ReferenzElemente")
+        if int(r.attrib.get("StrElement", 0)) in streckenelemente[zusi_relpath]
+    )
+    fahrstrassen[zusi_relpath] = tree.findall("./Strecke/Fahrstrasse")
+    nachbarmodule[zusi_relpath] = [get_modul_aus_dateiknoten(n) for n in tree.findall("./Strecke/ModulDateien")]
+
+def get_refpunkt(modul, nummer):
+    if modul not in referenzpunkte:
+        modul = normalize_zusi_relpath(modul)
+        if modul in missing:
+            return RefPunkt(modul, nummer, "", 0, None, "")
+        try:
+            lade_modul(modul)
+        except FileNotFoundError:
+            missing.add(modul)
+            return RefPunkt(modul, nummer, "", 0, None, "")
+
+    try:
+        (element, richtung, info, reftyp) = referenzpunkte[modul][nummer]
+    except KeyError:
+        return RefPunkt(modul, nummer, "", 0, None, "")
+    return RefPunkt(modul, nummer, info, reftyp, element, richtung)
+
+def get_element(modul, nummer):
+    if modul not in streckenelemente:
+        modul = normalize_zusi_relpath(modul)
+        if modul in missing:
+            return None
+        try:
+            lade_modul(modul)
+        except FileNotFoundError:
+            missing.add(modul)
+            return None
+
+    try:
+        return streckenelemente[modul][nummer]
+    except KeyError:
+        return None
+
+# Sucht Knoten ./Datei und liefert Modul zurueck (leerer String oder nicht vorhandener Knoten = Fallback; leerer Fallback = dieses Modul)
+def get_modul_aus_dateiknoten(knoten, fallback=''):
+    if len(fallback) == 0:
+        fallback = dieses_modul
+    datei = knoten.find("./Datei")
+    if datei is not None:
+        return normalize_zusi_relpath(datei.attrib.get("Dateiname", fallback))
+    return fallback
+
+# -----
+
+def gegen(el_r):
+    return (el_r[0], el_r[1], not el_r[2]) if el_r is not None else None
+
+def nachfolger(el_r, index):
+    (modul, el, richtung) = el_r
+    if el is None:
+        return None
+
+    anschluss = int(el.attrib.get("Anschluss", 0))
+    anschluss_shift = index + (8 if richtung == GEGEN else 0)
+
+    nachfolger = [n for n in el if
+        (richtung == NORM and (n.tag == "NachNorm" or n.tag == "NachNormModul")) or
+        (richtung == GEGEN and (n.tag == "NachGegen" or n.tag == "NachGegenModul"))]
+
+    if index >= len(nachfolger):
+        return None
+
+    nachfolger_knoten = nachfolger[index]
+    if "Modul" not in nachfolger_knoten.tag:
+        nach_modul = modul
+        nach_el = get_element(nach_modul, int(nachfolger_knoten.attrib.get("Nr", 0)))
+        nach_richtung = NORM if (anschluss >> anschluss_shift) & 1 == 0 else GEGEN
+    else:
+        nach_modul = get_modul_aus_dateiknoten(nachfolger_knoten)
+        nach_ref = get_refpunkt(nach_modul, int(nachfolger_knoten.attrib.get("Nr", 0)))
+        nach_el = nach_ref.element if nach_ref.valid() else None
+        nach_richtung = GEGEN if nach_ref.richtung == NORM else NORM
+
+    if nach_el is None:
+        return None
+    return (nach_modul, nach_el, nach_richtung)
+
+def vorgaenger(el_r):
+    return gegen(nachfolger(gegen(el_r)))
+
+# -----
+
+# Signal-LS3 -> [Animationsname]
+animationen = dict()
+
+def get_animationen(signal_ls3_relpath):
+    signal_ls3_relpath = normalize_zusi_relpath(signal_ls3_relpath)
+    if signal_ls3_relpath not in animationen:
+        try:
+            tree = ET.parse(get_abspath(signal_ls3_relpath))
+            animationen[signal_ls3_relpath] = [n.attrib.get("AniBeschreibung", "?") for n in tree.findall("./Landschaft/Animation")]
+        except FileNotFoundError:
+            animationen[signal_ls3_relpath] = []
+    return animationen[signal_ls3_relpath]
+
+# <Signal>-Knoten -> [Animationsname oder None], Index = Bit im Signalbild
+signalbild_bits = dict()
+
+def get_signalbild_bits(signal):
+    try:
+        return signalbild_bits[signal]
+    except KeyError:
+        pass
+
+    result = []
+    for sigframe in signal.findall("./SignalFrame/Datei"):
+        if "Dateiname" in sigframe.attrib:
+            animationen = get_animationen(sigframe.attrib["Dateiname"])
+        else:
+            animationen = []
+        if len(animationen) == 0:
+            result.append(None)
+        else:
+            result.extend(animationen)
+
+    signalbild_bits[signal] = result
+    return result
+
+def get_signalbild_fuer_id(signal, signalbild_id):
+    result = [ani_name for idx, ani_name in enumerate(get_signalbild_bits(signal))
+        if ani_name is not None and signalbild_id & (1 << idx) != 0]
+    return "?" if len(result) == 0 else " + ".join(result)
+
+def get_signalbild_fuer_spalte(signal, spalte):
+    signalbild_id = all_ones
+    zeile_gefunden = False
+    zeilen = signal.findall("./HsigBegriff")
+    anz_spalten = len(signal.findall("./VsigBegriff"))
+    matrix = signal.findall("./MatrixEintrag")
+
+    ereignisse = None
+
+    for idx, zeile in enumerate(zeilen):
+        # Betrachte nur Zeilen fuer Zugfahrten mit Geschwindigkeit > 0,
+        # sonst kann im H/V-System das Signalbild nicht bestimmt werden
+        # (bei Hp0 ist Vorsignal dunkel)
+        if float(zeile.attrib.get("HsigGeschw", 0.0)) != 0.0 and int(zeile.attrib.get("FahrstrTyp", 0)) & 4 != 0:
+            zeile_gefunden = True
+            eintrag = matrix[idx * anz_spalten + spalte]
+            signalbild_id &= int(eintrag.attrib.get("Signalbild", 0))
+            eintrag_ereignisse = set(int(e.attrib.get("Er", 0)) for e in eintrag.findall("./Ereignis"))
+            if ereignisse is None:
+                ereignisse = eintrag_ereignisse.copy()
+            else:
+                ereignisse = ereignisse.intersection(eintrag_ereignisse)
+
+    if not zeile_gefunden:
+        signalbild_id = 0
+
+    return get_signalbild_fuer_id(signal, signalbild_id) + ("" if ereignisse is None or len(ereignisse) == 0 else (" + " + " + ".join(str(e) for e in ereignisse)))
+
+def get_signalbild_fuer_zeile(signal, zeile, ersatzsignal):
+    if ersatzsignal:
+        try:
+            ersatzsignal_knoten = signal.findall("./Ersatzsignal")[zeile]
+        except IndexError:
+            return '?'
+        name = ersatzsignal_knoten.attrib.get("ErsatzsigBezeichnung", "?") + ": "
+        eintrag_vsig_geschw_0 = ersatzsignal_knoten.find("./MatrixEintrag")
+        signalbild_id = int(eintrag_vsig_geschw_0.attrib.get("Signalbild", 0))
+
+    else:
+        signalbild_id = all_ones
+        anz_spalten = len(signal.findall("./VsigBegriff"))
+        matrix = signal.findall("./MatrixEintrag")
+
+        for i in range(0, anz_spalten):
+            signalbild_id &= int(matrix[zeile * anz_spalten + i].attrib.get("Signalbild", 0))
+
+        # Finde Eintrag mit Vorsignalgeschwindigkeit 0
+        # (dieser wird beim Stellen der Fahrstrasse auf jeden Fall angesteuert)
+        spalte_geschw_0 = 0
+        for idx, vsig_begriff in enumerate(signal.findall("VsigBegriff")):
+            if vsig_begriff.attrib.get("VsigGeschw", 0) == 0:
+                spalte_geschw_0 = idx
+                break
+
+        eintrag_vsig_geschw_0 = matrix[zeile * anz_spalten + spalte_geschw_0]
+        name = ""
+
+    befehl_einblenden = ""
+    for e in eintrag_vsig_geschw_0.findall("./Ereignis"):
+        if int(e.attrib.get("Er", 0)) == 32:
+            befehl_einblenden += ' + Befehl einblenden ({} m)'.format(e.attrib.get("Wert", 0))
+
+    return name + get_signalbild_fuer_id(signal, signalbild_id) + befehl_einblenden
+
+def get_signalbild_id_fuer_zeile_und_spalte(signal, zeile, spalte, ersatzsignal):
+    if ersatzsignal:
+        matrix = signal.findall("./Ersatzsignal/MatrixEintrag")
+        return int(matrix[zeile].attrib.get("Signalbild", 0))
+    else:
+        anz_spalten = len(signal.findall("./VsigBegriff"))
+        matrix = signal.findall("./MatrixEintrag")
+        return int(matrix[zeile * anz_spalten + spalte].attrib.get("Signalbild", 0))
+
+def get_signalgeschw_fuer_zeile_und_spalte(signal, zeile, spalte, ersatzsignal):
+    if ersatzsignal:
+        matrix = signal.findall("./Ersatzsignal/MatrixEintrag")
+        return float(matrix[zeile].attrib.get("MatrixGeschw", 0))
+    else:
+        anz_spalten = len(signal.findall("./VsigBegriff"))
+        matrix = signal.findall("./MatrixEintrag")
+        return float(matrix[zeile * anz_spalten + spalte].attrib.get("MatrixGeschw", 0))
+
+# -----
+
+def lade_nachbarmodule(modul):
+    for m in nachbarmodule[modul]:
+        if m in streckenelemente or m in missing:
+            continue
+        try:
+            lade_modul(m)
+        except FileNotFoundError:
+            missing.add(m)
+
+def get_fahrstrasse_weichen(f):
+    """
+    Gibt die Weichenstellungen der Fahrstrasse f zurueck ((modul, element, richtung) -> Index des Nachfolgers).
+    """
+    weichen_rp = [(get_refpunkt(get_modul_aus_dateiknoten(weiche), int(weiche.attrib.get("Ref", 0))), int(weiche.attrib.get("FahrstrWeichenlage", 0)) - 1)
+        for weiche in f.findall("./FahrstrWeiche")]
+    return dict((rp.el_r(), weichenlage) for (rp, weichenlage) in weichen_rp)
+
+def get_fahrstrasse_weg(f):
+    """
+    Faehrt die Fahrstrasse f vom Start- bis zum Zielpunkt ab und gibt (elemente, ziel_erreicht) zurueck,
+    wobei elemente die Liste der befahrenen (modul, element, richtung)-Tupel ist. Ist Start- oder Zielpunkt
+    nicht aufloesbar, ist die Liste leer. Die Fahrt endet spaetestens, wenn ein Element zum zweiten Mal erreicht wird.
+    """
+    startknoten = f.find("./FahrstrStart")
+    start_rp = get_refpunkt(get_modul_aus_dateiknoten(startknoten), int(startknoten.attrib.get("Ref", 0)))
+    start = start_rp.el_r()
+
+    zielknoten = f.find("./FahrstrZiel")
+    ziel_rp = get_refpunkt(get_modul_aus_dateiknoten(zielknoten), int(zielknoten.attrib.get("Ref", 0)))
+    ziel = ziel_rp.el_r()
+
+    weichen = get_fahrstrasse_weichen(f)
+
+    elemente = []
+    if start_rp.valid() and ziel_rp.valid():
+        akt = start
+        besucht = set()
+        while akt is not None and akt not in besucht:
+            elemente.append(akt)
+            if akt == ziel:
+                return (elemente, True)
+            besucht.add(akt)
+            akt = nachfolger(akt, weichen.get(akt, 0))
+    return (elemente, False)
+
+def get_fahrstrasse_elemente(f):
+    """
+    Gibt die Liste der befahrenen (modul, element, richtung)-Tupel der Fahrstrasse f zurueck (siehe get_fahrstrasse_weg).
+    """
+    return get_fahrstrasse_weg(f)[0]
+
+def get_signal_refpunkte(signalname):
+    """
+    Gibt die Referenzpunkte aller Signale in diesem Modul zurueck, deren Name signalname ist (None = alle Signale).
+    """
+    result = []
+    for refnr, (element, richtung, reftyp, info) in referenzpunkte[dieses_modul].items():
+        if reftyp == 4:
+            sig = element.find("./Info" + ("Norm" if richtung == NORM else "Gegen") + "Richtung/Signal")
+            if sig is not None and (signalname is None or sig.attrib.get("Signalname", "") == signalname):
+                result.append(get_refpunkt(dieses_modul, refnr))
+    return result
+
+def get_fahrstrassen_an_signal(rp):
+    """
+    Gibt die Fahrstrassen aller geladenen Module zurueck, in denen das Signal am Referenzpunkt rp
+    als Hauptsignal bzw. als Vorsignal enthalten ist.
+    """
+    hsig_fahrstrassen = set()
+    vsig_fahrstrassen = set()
+
+    for fahrstrassen_liste in fahrstrassen.values():
+        for fahrstrasse in fahrstrassen_liste:
+            if any(int(n.attrib.get("Ref", 0)) == rp.refnr
+                    and get_modul_aus_dateiknoten(n) == rp.modul
+                    for n in fahrstrasse.findall("./FahrstrSignal")):
+                hsig_fahrstrassen.add(fahrstrasse)
+
+            if any(int(n.attrib.get("Ref", 0)) == rp.refnr
+                    and get_modul_aus_dateiknoten(n) == rp.modul
+                    for n in fahrstrasse.findall("./FahrstrVSignal")):
+                vsig_fahrstrassen.add(fahrstrasse)
+
+    return (hsig_fahrstrassen, vsig_fahrstrassen)
+
+def get_signalbild_kombinationen(rp):
+    """
+    Gibt fuer das Signal am Referenzpunkt rp die Signalbildwechsel beim Stellen einer Folgefahrstrasse zurueck
+    (Beschreibung des Wechsels -> [Fahrstrassenkombination]).
+    """
+    (hsig_fahrstrassen, vsig_fahrstrassen) = get_fahrstrassen_an_signal(rp)
+
+    # [((<Signal>-Knoten, Signalbild alt, Signalbild neu, Geschw. alt, Geschw. neu), Fahrstrassenkombination)]
+    wechsel_liste = []
+
+    for fahrstr_hsig in hsig_fahrstrassen:
+        for fahrstr_vsig in vsig_fahrstrassen:
+            ziel1 = fahrstr_hsig.find("./FahrstrZiel")
+            start2 = fahrstr_vsig.find("./FahrstrStart")
+
+            if ziel1 is None or start2 is None \
+                    or ziel1.attrib.get("Ref", 0) != start2.attrib.get("Ref", 0) \
+                    or get_modul_aus_dateiknoten(ziel1) != get_modul_aus_dateiknoten(start2):
+                continue
+
+            # <Signal>-Knoten -> (zeile, spalte, ist_ersatzsignal)
+            hsig_stellungen = {}
+
+            for an_hsig in fahrstr_hsig.findall("./FahrstrSignal"):
+                signal = get_refpunkt(get_modul_aus_dateiknoten(an_hsig), int(an_hsig.attrib["Ref"])).signal()
+
+                # Finde Spalte mit Spaltengeschwindigkeit 0
+                spalte_geschw_0 = 0
+                for idx, vsig_begriff in enumerate(signal.findall("VsigBegriff")):
+                    if vsig_begriff.attrib.get("VsigGeschw", 0) == 0:
+                        spalte_geschw_0 = idx
+                        break
+
+                zeile = int(an_hsig.attrib.get("FahrstrSignalZeile", 0))
+                ersatzsignal = int(an_hsig.attrib.get("FahrstrSignalErsatzsignal", 0)) == 1
+
+                hsig_stellungen[signal] = (zeile, spalte_geschw_0, ersatzsignal)
+
+            for ab_vsig in fahrstr_vsig.findall("./FahrstrVSignal"):
+                signal = get_refpunkt(get_modul_aus_dateiknoten(ab_vsig), int(ab_vsig.attrib["Ref"])).signal()
+
+                if signal not in hsig_stellungen:
+                    continue
+
+                hsig_stellung = hsig_stellungen[signal]
+                spalte_neu = int(ab_vsig.attrib.get("FahrstrSignalSpalte", 0))
+
+                geschw_alt = get_signalgeschw_fuer_zeile_und_spalte(signal, *hsig_stellung)
+                geschw_neu = get_signalgeschw_fuer_zeile_und_spalte(signal, hsig_stellung[0], spalte_neu, hsig_stellung[2])
+
+                signalbild_alt = get_signalbild_id_fuer_zeile_und_spalte(signal, *hsig_stellung)
+                if geschw_alt == geschw_neu:
+                    hsig_stellung_neu = (hsig_stellung[0], spalte_neu, hsig_stellung[2])
+                    signalbild_neu = get_signalbild_id_fuer_zeile_und_spalte(signal, *hsig_stellung_neu)
+                    wechsel = (signal, signalbild_alt, signalbild_neu, None, None)
+                else:
+                    wechsel = (signal, signalbild_alt, None, geschw_alt, geschw_neu)
+
+                wechsel_liste.append((wechsel, "{} + {}".format(
+                    colored(fahrstr_hsig.attrib.get("FahrstrName", ""), 'red'),
+                    colored(fahrstr_vsig.attrib.get("FahrstrName", ""), 'blue'),
+                )))
+
+    # Auf grossen Bahnhoefen wiederholen sich wenige Signalbildwechsel sehr oft,
+    # daher jeden Wechsel und jedes Signalbild nur einmal in Text umwandeln.
+    signalbilder = {}
+    def signalbild(signal, signalbild_id):
+        try:
+            return signalbilder[(signal, signalbild_id)]
+        except KeyError:
+            result = signalbilder[(signal, signalbild_id)] = get_signalbild_fuer_id(signal, signalbild_id)
+            return result
+
+    keys = {}
+    for wechsel, _ in wechsel_liste:
+        if wechsel in keys:
+            continue
+        (signal, signalbild_alt, signalbild_neu, geschw_alt, geschw_neu) = wechsel
+        if signalbild_neu is not None:
+            weg = signalbild_alt & ~signalbild_neu
+            dazu = signalbild_neu & ~signalbild_alt
+
+            keys[wechsel] = "{} -> {} ({} -> {})".format(
+                colored(signalbild(signal, weg), 'red', attrs=['bold']),
+                colored(signalbild(signal, dazu), 'blue', attrs=['bold']),
+                colored(signalbild(signal, signalbild_alt), 'red'),
+                colored(signalbild(signal, signalbild_neu), 'blue'),
+            )
+        else:
+            keys[wechsel] = "{} -> {}".format(
+                colored(signalbild(signal, signalbild_alt), 'red', attrs=['bold']),
+                colored("<bleibt auf Vsig=0 wegen unterschiedlicher Signalgeschwindigkeiten: {} -> {}>".format(str_geschw(geschw_alt), str_geschw(geschw_neu)), 'blue', attrs=['bold']),
+            )
+
+    # string -> [Fahrstrassenname]
+    kombinationen = defaultdict(list)
+    for wechsel, fahrstrassen_namen in wechsel_liste:
+        kombinationen[keys[wechsel]].append(fahrstrassen_namen)
+
+    return kombinationen
+
+def an_signal_ausgeben(rp, out):
+    kombinationen = get_signalbild_kombinationen(rp)
+
+    print("\n\n{} {}".format(
+        colored(rp.signal().attrib.get("NameBetriebsstelle", "?"), 'grey'),
+        colored(rp.signal().attrib.get("Signalname", "?"), 'grey', attrs=['bold']),
+    ), file=out)
+
+    for key, values in sorted(kombinationen.items()):
+        print("\n" + key, file=out)
+        for value in values:
+            print(" - " + value, file=out)
+
+def str_fahrstrasse_kopf(f):
+    nichtalsziel = float(f.attrib.get("ZufallsWert", 0))
+    rglggl = int(f.attrib.get("RglGgl", 0))
+    return "Fahrstrasse {} {}   {}, {:.0f}m{}".format(
+        f.attrib.get("FahrstrTyp", "?"),
+        colored(f.attrib.get("FahrstrName", "?"), 'grey', attrs=['bold']),
+        "Bahnhof" if rglggl == 0 else ("eingleisig" if rglggl == 1 else ("Regelgleis" if rglggl == 2 else ("Gegengleis" if rglggl == 3 else "?"))),
+        float(f.attrib.get("Laenge", 0)),
+        '' if nichtalsziel == 0 else ' (nicht als Ziel: {:.0f}%)'.format(nichtalsziel * 100))
+
+def fahrstrasse_bericht(f):
+    """
+    Gibt (ausgeben, text) fuer die Fahrstrasse f zurueck. ausgeben ist False, wenn die Fahrstrasse
+    wegen --hsig-ausserhalb-fahrstrasse/--vsig-geschw=ausgeben_exkl nicht ausgegeben werden soll.
+    """
+    print_out = args.hsig_ausserhalb_fahrstrasse != 'ausgeben_exkl' and args.vsig_geschw != 'ausgeben_exkl'
+    with io.StringIO() as out:
+        print("\n" + str_fahrstrasse_kopf(f), file=out)
+
+        min_geschw = -1
+
+        startknoten = f.find("./FahrstrStart")
+        start_rp = get_refpunkt(get_modul_aus_dateiknoten(startknoten), int(startknoten.attrib.get("Ref", 0)))
+
+        zielknoten = f.find("./FahrstrZiel")
+        ziel_rp = get_refpunkt(get_modul_aus_dateiknoten(zielknoten), int(zielknoten.attrib.get("Ref", 0)))
+
+        if start_rp.valid():
+            print(" - {}".format(start_rp), end='', file=out)
+        else:
+            print(" - " + colored("Nicht aufloesbare Referenz {} in Modul {}".format(start_rp.refnr, start_rp.modul_kurz()), 'white', 'on_red'), end='', file=out)
+
+        if ziel_rp.valid():
+            print(" -> {}".format(ziel_rp), file=out)
+        else:
+            print(" -> " + colored("Zielpunkt mit nicht aufloesbarer Referenz {} in Modul {}".format(ziel_rp.refnr, ziel_rp.modul_kurz()), 'white', 'on_red'), file=out)
+
+        elemente = get_fahrstrasse_elemente(f)
+
+        # Referenzpunkt -> [modul, el, ri, schliessen]
+        bue = defaultdict(list)
+
+        if args.bue:
+            for modul, el, ri in elemente:
+                for ereignis in el.findall("./Info" + ("Norm" if ri == NORM else "Gegen") + "Richtung/Ereignis"):
+                    er_nr = int(ereignis.get("Er", 0))
+                    if er_nr in {27, 1000027}:
+                        # TODO: nur 1x pro Streckenmodul ausgeben
+                        try:
+                            rp = get_refpunkt(normalize_zusi_relpath(ereignis.get("Beschr", "")), int(ereignis.get("Wert", 0)))
+                        except:
+                            print(" - " + colored("Bahnuebergang oeffnen/schliessen mit ungueltiger Referenzangabe: Modul '{}', Referenznr. '{}'".format(ereignis.get("Beschr", ""), ereignis.get("Wert", "")), 'white', 'on_red') + " an {}".format(str_el_ri(modul, el, ri)), file=out)
+                        if not rp.valid():
+                            print(" - " + colored("Bahnuebergang oeffnen/schliessen mit nicht aufloesbarer Referenz {} in Modul {}".format(rp.refnr, rp.modul), 'white', 'on_red') + " an {}".format(str_el_ri(modul, el, ri)), file=out)
+                            continue
+                        signal = rp.signal()
+                        if signal is None:
+                            print(" - " + colored("Bahnuebergang oeffnen/schliessen mit fehlendem Signal an {} (Referenznummer {})".format(rp, rp.refnr), 'white', 'on_red') + " an {}".format(str_el_ri(modul, el, ri)), file=out)
+                            continue
+
+                        bue[rp].append((modul, el, ri, er_nr == 27))
+
+        for sig in f.findall("./FahrstrSignal"):
+            rp = get_refpunkt(get_modul_aus_dateiknoten(sig), int(sig.attrib.get("Ref", 0)))
+            if not rp.valid():
+                print(" - " + colored("Hauptsignal mit nicht aufloesbarer Referenz {} in Modul {}".format(rp.refnr, rp.modul_kurz()), 'white', 'on_red'), file=out)
+                continue
+            signal = rp.signal()
+            if signal is None:
+                print(" - " + colored("Hauptsignal-Referenz mit fehlendem Signal an {} (Referenznummer {})".format(rp, rp.refnr), 'white', 'on_red'), file=out)
+                continue
+
+            hat_zaehler = int(signal.attrib.get("SignalFlags", 0)) & 8 != 0
+            hat_bue = False
+
+            ersatzsignal = int(sig.attrib.get("FahrstrSignalErsatzsignal", 0)) == 1
+            zeile = int(sig.attrib.get("FahrstrSignalZeile", 0))
+            hsig_geschw = float(signal.findall("./HsigBegriff")[zeile].attrib.get("HsigGeschw", 0.0)) if not ersatzsignal else 0.0
+            if ersatzsignal or hsig_geschw != 0:
+                # == 0 ohne Ersatzsignal koennen z.B. Flachkreuzungen sein
+                min_geschw = geschw_min(min_geschw, hsig_geschw)
+            print(" - Hauptsignal{} {} {} an {} auf {} {} ({}) {}".format(
+                ("+" if hat_zaehler else ""),
+                colored(signal.attrib.get("NameBetriebsstelle", "?"), 'blue'),
+                colored(signal.attrib.get("Signalname", "?"), 'blue', attrs=['bold']),
+                rp,
+                ("Zeile" if not ersatzsignal else (colored("Ersatzsignal", 'grey', attrs=['underline']) + 'zeile')),
+                zeile,
+                colored(str_geschw(hsig_geschw), 'red', attrs=['bold']),
+                get_signalbild_fuer_zeile(signal, zeile, ersatzsignal),
+            ), file=out)
+
+            for modul, el, ri, schliessen in bue[rp]:
+                if schliessen:
+                    hat_bue = True
+                    print("   - " + colored("!!! Bue schliessen an {}".format(str_el_ri(modul, el, ri)), 'red', attrs=['bold']), file=out)
+            for modul, el, ri, schliessen in bue[rp]:
+                if not schliessen:
+                    hat_bue = True
+                    print("   - " + colored("Bue oeffnen", 'green') + " an {}".format(str_el_ri(modul, el, ri)), file=out)
+            del bue[rp]
+
+            if args.hsig_ausserhalb_fahrstrasse != 'ignorieren' and \
+                    rp.el_r() not in elemente and \
+                    (gegen(rp.el_r()) not in elemente or int(signal.attrib.get("SignalFlags", 0)) & 1 == 0):
+                print("   - " + colored("!!! Hauptsignal ausserhalb der Fahrstrasse", 'red', attrs=['bold']), file=out)
+                print_out = True
+
+            ksig = signal.find("./KoppelSignal")
+            indent = 2
+            while ksig is not None:
+                rp = get_refpunkt(get_modul_aus_dateiknoten(ksig, rp.modul), int(ksig.attrib.get("ReferenzNr", 0)))
+                if not rp.valid():
+                    print("{} - ".format(" " * indent) + colored("Koppelsignal mit nicht aufloesbarer Referenz {} in Modul {}".format(rp.refnr, rp.modul_kurz()), 'white', 'on_red'), file=out)
+                    break
+                koppelsignal = rp.signal()
+                if koppelsignal is None:
+                    print("{} - ".format(" " * indent) + colored("Koppelsignal-Referenz mit fehlendem Signal an {} (Referenznummer {})".format(rp, rp.refnr), 'white', 'on_red'), file=out)
+                    break
+                hat_zaehler = hat_zaehler or int(koppelsignal.attrib.get("SignalFlags", 0)) & 8 != 0
+                hsig_begriffe = koppelsignal.findall("./HsigBegriff")
+                if zeile >= len(hsig_begriffe):
+                    print("{} - ".format(" " * indent) + colored("Koppelsignal hat nicht genuegend Zeilen an {} (Referenznummer {})".format(rp, rp.refnr), 'white', 'on_red'), file=out)
+                    break
+                print("{} - Koppelsignal{} {} {} an {} auf Zeile {} ({}) {}".format(
+                    " " * indent,
+                    ("+" if int(koppelsignal.attrib.get("SignalFlags", 0)) & 8 != 0 else ""),
+                    colored(koppelsignal.attrib.get("NameBetriebsstelle", "?"), 'blue'),
+                    colored(koppelsignal.attrib.get("Signalname", "?"), 'blue', attrs=['bold']),
+                    rp,
+                    zeile,
+                    colored(str_geschw(float(hsig_begriffe[zeile].attrib.get("HsigGeschw", 0.0))), 'red', attrs=['bold']),
+                    get_signalbild_fuer_zeile(koppelsignal, zeile, ersatzsignal),
+                ), file=out)
+                indent += 2
+                ksig = koppelsignal.find("./KoppelSignal")
+
+            if hat_bue and not hat_zaehler:
+                print("   - " + colored("!!! Kein Signal mit Bue-Zaehler in der Koppelungskette", 'red', attrs=['bold']), file=out)
+
+        for sig in f.findall("./FahrstrVSignal"):
+            rp = get_refpunkt(get_modul_aus_dateiknoten(sig), int(sig.attrib.get("Ref", 0)))
+            if not rp.valid():
+                print(" - " + colored("Vorsignal mit nicht aufloesbarer Referenz {} in Modul {}".format(rp.refnr, rp.modul_kurz()), 'white', 'on_red'), file=out)
+                continue
+            signal = rp.signal()
+            spalte = int(sig.attrib.get("FahrstrSignalSpalte", 0))
+            try:
+                vsig_geschw = float(signal.findall("./VsigBegriff")[spalte].attrib.get("VsigGeschw", 0.0))
+            except IndexError:
+                print(" - Vorsignal {} {} an {} auf Spalte {} ({})".format(
+                    colored(signal.attrib.get("NameBetriebsstelle", "?"), 'cyan'),
+                    colored(signal.attrib.get("Signalname", "?"), 'cyan', attrs=['bold']),
+                    rp,
+                    spalte,
+                    colored('ungueltige Spaltennummer', 'white', 'on_red'),
+                ), file=out)
+                continue
+
+            alarm = ''
+            if args.vsig_geschw != 'ignorieren' and vsig_geschw != -2.0 and geschw_kleiner(min_geschw, vsig_geschw):
+                alarm = colored(" !!!!", 'red', attrs=['bold'])
+                print_out = True
+
+            print(" - Vorsignal {} {} an {} auf Spalte {} ({}) {}{}".format(
+                colored(signal.attrib.get("NameBetriebsstelle", "?"), 'cyan'),
+                colored(signal.attrib.get("Signalname", "?"), 'cyan', attrs=['bold']),
+                rp,
+                spalte,
+                colored(str_geschw(vsig_geschw), 'green', attrs=['bold']),
+                get_signalbild_fuer_spalte(signal, spalte),
+                alarm
+            ), file=out)
+
+            if alarm != '' and args.vsig_geschw == 'ausgeben_exkl':
+                print("   - Signal-Frames:", file=out)
+                for sigframe in signal.findall("./SignalFrame/Datei"):
+                    dateiname = sigframe.attrib.get("Dateiname", "")
+                    print("     - {} {}".format(dateiname, ", ".join(get_animationen(dateiname))), file=out)
+                print("   - Hsig-Geschwindigkeiten: {}".format(", ".join(map(str_geschw, [float(n.attrib.get("HsigGeschw", 0)) for n in signal.findall("./HsigBegriff")]))), file=out)
+                print("   - Vsig-Geschwindigkeiten: {}".format(", ".join(map(str_geschw, [float(n.attrib.get("VsigGeschw", 0)) for n in signal.findall("./VsigBegriff")]))), file=out)
+
+        if args.bue:
+            for rp, values in bue.items():
+                signal = rp.signal()
+                hat_zaehler = int(signal.attrib.get("SignalFlags", 0)) & 8 != 0
+
+                print(" - Bahnuebergang{} {} {} an {}".format(
+                    ("+" if hat_zaehler else ""),
+                    colored(signal.attrib.get("NameBetriebsstelle", "?"), 'green'),
+                    colored(signal.attrib.get("Signalname", "?"), 'green', attrs=['bold']),
+                    rp,
+                ), file=out)
+
+                hat_schliessen = False
+                for modul, el, ri, schliessen in values:
+                    if schliessen:
+                        hat_schliessen = True
+                        print("   - " + colored("Bue schliessen", 'green') + " an {}".format(str_el_ri(modul, el, ri)), file=out)
+                if not hat_schliessen:
+                    print("   - " + colored("!!! Kein Schliessen-Ereignis in der Fahrstrasse", 'red', attrs=['bold']), file=out)
+
+                hat_oeffnen = False
+                for modul, el, ri, schliessen in values:
+                    if not schliessen:
+                        hat_oeffnen = True
+                        print("   - " + colored("Bue oeffnen", 'green') + " an {}".format(str_el_ri(modul, el, ri)), file=out)
+                if not hat_oeffnen:
+                    print("   - " + colored("!!! Kein Oeffnen-Ereignis in der Fahrstrasse", 'red', attrs=['bold']), file=out)
+
+                ksig = signal.find("./KoppelSignal")
+                indent = 2
+                while ksig is not None:
+                    rp = get_refpunkt(get_modul_aus_dateiknoten(ksig, rp.modul), int(ksig.attrib.get("ReferenzNr", 0)))
+                    if not rp.valid():
+                        print("{} - ".format(" " * indent) + colored("Koppelsignal mit nicht aufloesbarer Referenz {} in Modul {}".format(rp.refnr, rp.modul), 'white', 'on_red'), file=out)
+                        break
+                    koppelsignal = rp.signal()
+                    if koppelsignal is None:
+                        print("{} - ".format(" " * indent) + colored("Koppelsignal-Referenz mit fehlendem Signal an {} (Referenznummer {})".format(rp, rp.refnr), 'white', 'on_red'), file=out)
+                        break
+                    hat_zaehler = hat_zaehler or int(koppelsignal.attrib.get("SignalFlags", 0)) & 8 != 0
+                    print("{} - Koppelsignal{} {} {} an {}".format(
+                        " " * indent,
+                        ("+" if int(koppelsignal.attrib.get("SignalFlags", 0)) & 8 != 0 else ""),
+                        colored(koppelsignal.attrib.get("NameBetriebsstelle", "?"), 'green'),
+                        colored(koppelsignal.attrib.get("Signalname", "?"), 'green', attrs=['bold']),
+                        rp,
+                    ), file=out)
+                    indent += 2
+                    ksig = koppelsignal.find("./KoppelSignal")
+
+                if not hat_zaehler:
+                    print("   - " + colored("!!! Kein Signal mit Bue-Zaehler in der Koppelungskette", 'red', attrs=['bold']), file=out)
+
+        if args.register:
+            reg_strs = []
+            for reg in f.findall("./FahrstrRegister"):
+                rp = get_refpunkt(get_modul_aus_dateiknoten(reg), int(reg.attrib.get("Ref", 0)))
+                if not rp.valid():
+                    reg_strs.append(colored("Register mit nicht aufloesbarer Referenz {} in Modul {}".format(rp.refnr, rp.modul_kurz()), 'white', 'on_red'))
+                    continue
+                richtung = rp.element.find("./Info" + ("Norm" if rp.richtung == NORM else "Gegen") + "Richtung")
+                regnr = richtung.attrib.get("Reg", 0)
+                reg_strs.append("{}{}".format(regnr, "" if rp.modul == dieses_modul else ("[" + rp.modul_kurz() + "]")))
+
+            print(" - Register: {}".format(", ".join(reg_strs)), file=out)
+
+        if args.weichen:
+            for weiche in f.findall("./FahrstrWeiche"):
+                rp = get_refpunkt(get_modul_aus_dateiknoten(weiche), int(weiche.attrib.get("Ref", 0)))
+                if not rp.valid():
+                    print(colored("Weiche mit nicht aufloesbarer Referenz {} in Modul {}".format(rp.refnr, rp.modul_kurz()), 'white', 'on_red'), file=out)
+                    continue
+                print(" - Weiche an {} auf Nachfolger {}".format(rp, weiche.attrib.get("FahrstrWeichenlage", 0)), file=out)
+
+        return (print_out, out.getvalue())
+
+def fahrstrasse_bericht_nach_index(idx):
+    return fahrstrasse_bericht(fahrstrassen[dieses_modul][idx])
+
+def fahrstrassen_berichte(fahrstrassen_liste, jobs):
+    """
+    Liefert fahrstrasse_bericht(f) fuer alle Fahrstrassen f in fahrstrassen_liste in deren Reihenfolge.
+    Bei jobs > 1 werden die Fahrstrassen auf Prozesse verteilt, die nach dem Laden dieses Moduls und
+    seiner Nachbarmodule abgespalten werden (fahrstrassen_liste muss dann fahrstrassen[dieses_modul] sein).
+    """
+    if jobs > 1:
+        import multiprocessing
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            logging.warning("--jobs wird auf diesem Betriebssystem nicht unterstuetzt, Fahrstrassen werden nacheinander ausgewertet")
+            jobs = 1
+
+    if jobs <= 1 or len(fahrstrassen_liste) < 2:
+        for f in fahrstrassen_liste:
+            yield fahrstrasse_bericht(f)
+        return
+
+    # Nachbarmodule vor dem Abspalten laden, damit nicht jeder Prozess sie erneut einlesen muss.
+    lade_nachbarmodule(dieses_modul)
+
+    with multiprocessing.get_context('fork').Pool(jobs) as pool:
+        yield from pool.imap(fahrstrasse_bericht_nach_index, range(len(fahrstrassen_liste)),
+            chunksize=max(1, len(fahrstrassen_liste) // (jobs * 8)))
+
+def get_konflikte(fahrstrassen_liste):
+    """
+    Bestimmt die Konflikte zwischen den Fahrstrassen in fahrstrassen_liste. Jede Fahrstrasse wird einmal
+    abgefahren; die Konflikte werden ueber einen Index Element -> [Fahrstrasse] bestimmt, sodass nur
+    Fahrstrassenpaare betrachtet werden, die tatsaechlich ein Element gemeinsam haben.
+    Das Zielelement einer Fahrstrasse zaehlt nicht als gemeinsames Element mit einer dort beginnenden Fahrstrasse.
+    Fahrstrassen, deren Fahrt nicht am Zielpunkt endet, werden nicht beruecksichtigt.
+    Gibt ({(i, j): [gemeinsame Elemente, davon in Gegenrichtung, Weichen in unterschiedlicher Lage]} mit i < j,
+    [Indizes der nicht beruecksichtigten Fahrstrassen]) zurueck.
+    """
+    # (Modul, Elementnummer) -> Element-ID
+    element_ids = dict()
+    def element_id(modul, el):
+        return element_ids.setdefault((normalize_zusi_relpath(modul), int(el.attrib.get("Nr", 0))), len(element_ids))
+
+    # Element-ID -> [(Fahrstrassenindex, Richtungen)], Richtungen: Bit 0 = Norm, Bit 1 = Gegen
+    element_index = defaultdict(list)
+    # Element-ID der Weiche -> [(Fahrstrassenindex, Weichenlage)]
+    weichen_index = defaultdict(list)
+    # Fahrstrassenindex -> Element-ID des Start- bzw. Zielelements
+    start_ids = []
+    ziel_ids = []
+    nicht_aufloesbar = []
+
+    for idx, f in enumerate(fahrstrassen_liste):
+        (elemente, ziel_erreicht) = get_fahrstrasse_weg(f)
+        if not ziel_erreicht:
+            nicht_aufloesbar.append(idx)
+            start_ids.append(None)
+            ziel_ids.append(None)
+            continue
+        start_ids.append(element_id(*elemente[0][:2]))
+        ziel_ids.append(element_id(*elemente[-1][:2]))
+
+        # Element-ID -> Richtungen
+        richtungen = dict()
+        for modul, el, ri in elemente:
+            eid = element_id(modul, el)
+            richtungen[eid] = richtungen.get(eid, 0) | (1 if ri == NORM else 2)
+        for eid in sorted(richtungen):
+            element_index[eid].append((idx, richtungen[eid]))
+
+        for (modul, el, ri), weichenlage in get_fahrstrasse_weichen(f).items():
+            if el is not None:
+                weichen_index[element_id(modul, el)].append((idx, weichenlage))
+
+    konflikte = defaultdict(lambda: [0, 0, 0])
+
+    for eid, eintraege in element_index.items():
+        for k, (i, ri_i) in enumerate(eintraege):
+            for (j, ri_j) in eintraege[k + 1:]:
+                if (ziel_ids[i] == eid and start_ids[j] == eid) or (ziel_ids[j] == eid and start_ids[i] == eid):
+                    continue
+                konflikt = konflikte[(i, j)]
+                konflikt[0] += 1
+                if (ri_i | ri_j) == 3:
+                    konflikt[1] += 1
+
+    for eintraege in weichen_index.values():
+        for k, (i, lage_i) in enumerate(eintraege):
+            for (j, lage_j) in eintraege[k + 1:]:
+                if i != j and lage_i != lage_j:
+                    konflikte[(i, j)][2] += 1
+
+    return (konflikte, nicht_aufloesbar)
+
+def konflikte_ausgeben(fahrstrassen_liste, konflikte, nicht_aufloesbar, ausgabeformat, out):
+    for idx in nicht_aufloesbar:
+        logging.warning("Fahrstrasse {} endet nicht am Zielpunkt und wird nicht beruecksichtigt".format(fahrstrassen_liste[idx].attrib.get("FahrstrName", "")))
+
+    if ausgabeformat == 'json':
+        import json
+        json.dump({
+            "fahrstrassen": [f.attrib.get("FahrstrName", "") for f in fahrstrassen_liste],
+            "spalten": ["fahrstrasse1", "fahrstrasse2", "gemeinsame_elemente", "gegenrichtung", "weichen"],
+            "konflikte": [[i, j] + konflikte[(i, j)] for (i, j) in sorted(konflikte)],
+            "nicht_aufloesbar": nicht_aufloesbar,
+        }, out)
+        print(file=out)
+    else:
+        import csv
+        writer = csv.writer(out)
+        writer.writerow(["Fahrstrasse 1", "Fahrstrasse 2", "Gemeinsame Elemente", "Gegenrichtung", "Weichen"])
+        for (i, j) in sorted(konflikte):
+            writer.writerow([fahrstrassen_liste[i].attrib.get("FahrstrName", ""), fahrstrassen_liste[j].attrib.get("FahrstrName", "")] + konflikte[(i, j)])
+
+class TeilbaumScanner(object):
+    """
+    Parser-Target, das nur die Knoten direkt unterhalb von <Strecke> aufbaut, fuer die auswahl(tag, attrib)
+    True liefert, und alle anderen Knoten samt Unterknoten ueberspringt.
+    """
+    def __init__(self, auswahl):
+        self.auswahl = auswahl
+        self.tiefe = 0
+        self.builder = None
+        # Fertig gelesene Knoten
+        self.knoten = []
+
+    def start(self, tag, attrib):
+        self.tiefe += 1
+        if self.builder is not None:
+            self.builder.start(tag, attrib)
+        elif self.tiefe == 3 and self.auswahl(tag, attrib):
+            self.builder = ET.TreeBuilder()
+            self.builder.start(tag, attrib)
+
+    def end(self, tag):
+        self.tiefe -= 1
+        if self.builder is not None:
+            self.builder.end(tag)
+            if self.tiefe == 2:
+                self.knoten.append(self.builder.close())
+                self.builder = None
+
+    def data(self, data):
+        pass
+
+    def close(self):
+        pass
+
+def scanne_teilbaeume(zusi_relpath, auswahl):
+    """
+    Liest ein Modul mit einem Streaming-Parser und liefert die von auswahl(tag, attrib) ausgewaehlten
+    Knoten unterhalb von <Strecke> in Dateireihenfolge, sobald sie vollstaendig gelesen sind.
+    """
+    scanner = TeilbaumScanner(auswahl)
+    parser = ET.XMLParser(target=scanner)
+
+    with open(get_abspath(zusi_relpath), 'rb') as fp:
+        while True:
+            daten = fp.read(64 * 1024)
+            if daten:
+                parser.feed(daten)
+            else:
+                parser.close()
+
+            yield from scanner.knoten
+            scanner.knoten.clear()
+
+            if not daten:
+                break
+
+def scanne_fahrstrassen(zusi_relpath, filtertext=None):
+    """
+    Liest die <Fahrstrasse>-Knoten eines Moduls mit einem Streaming-Parser, ohne das Modul
+    (und seine Nachbarmodule) zu laden, und liefert diejenigen, deren Name oder Start- bzw. Zielsignal
+    filtertext enthaelt (Gross-/Kleinschreibung egal; None = alle Fahrstrassen).
+    Start- und Zielsignal werden ueber die Info der Referenzpunkte im selben Modul verglichen.
+    """
+    filtertext = None if filtertext is None else filtertext.lower()
+    # Referenznummer -> Info
+    refpunkt_infos = dict()
+
+    for knoten in scanne_teilbaeume(zusi_relpath, lambda tag, attrib: tag == "ReferenzElemente" or tag == "Fahrstrasse"):
+        if knoten.tag == "ReferenzElemente":
+            refpunkt_infos[int(knoten.attrib.get("ReferenzNr", 0))] = knoten.attrib.get("Info", "")
+        elif filtertext is None or filtertext in knoten.attrib.get("FahrstrName", "").lower():
+            yield knoten
+        else:
+            for pfad in ("./FahrstrStart", "./FahrstrZiel"):
+                refknoten = knoten.find(pfad)
+                if refknoten is not None and refknoten.find("./Datei") is None \
+                        and filtertext in refpunkt_infos.get(int(refknoten.attrib.get("Ref", 0)), "").lower():
+                    yield knoten
+                    break
+
+def lade_signal_refpunkte(zusi_relpath):
+    """
+    Gibt die Signal-Referenzpunkte (RefTyp 4) eines Moduls im Format von referenzpunkte zurueck, ohne das Modul
+    vollstaendig zu laden: Es werden nur die Streckenelemente aufgebaut, auf die ein solcher Referenzpunkt zeigt.
+    Stehen die Referenzpunkte erst hinter den Streckenelementen, wird das Modul doch vollstaendig geladen.
+    Ist das Modul bereits geladen, werden die vorhandenen Referenzpunkte verwendet.
+    """
+    if zusi_relpath in referenzpunkte:
+        return dict((refnr, r) for (refnr, r) in referenzpunkte[zusi_relpath].items() if r[2] == 4)
+
+    # Elementnummern, auf die ein Signal-Referenzpunkt zeigt, bzw. die uebersprungen wurden
+    signal_elemente = set()
+    uebersprungen = set()
+
+    def auswahl(tag, attrib):
+        if tag == "ReferenzElemente":
+            if int(attrib.get("RefTyp", 0)) == 4:
+                signal_elemente.add(int(attrib.get("StrElement", 0)))
+            return True
+        if tag == "StrElement":
+            nr = int(attrib.get("Nr", 0))
+            if nr in signal_elemente:
+                return True
+            uebersprungen.add(nr)
+        return False
+
+    elemente = dict()
+    refs = []
+    for knoten in scanne_teilbaeume(zusi_relpath, auswahl):
+        if knoten.tag == "StrElement":
+            elemente[int(knoten.attrib.get("Nr", 0))] = knoten
+        elif int(knoten.attrib.get("RefTyp", 0)) == 4:
+            refs.append(knoten)
+
+    if not signal_elemente.isdisjoint(uebersprungen):
+        lade_modul(zusi_relpath)
+        return dict((refnr, r) for (refnr, r) in referenzpunkte[zusi_relpath].items() if r[2] == 4)
+
+    return dict(
+        (int(r.attrib.get("ReferenzNr", 0)), (elemente[int(r.attrib.get("StrElement", 0))], NORM if int(r.attrib.get("StrNorm", 0)) == 1 else GEGEN, int(r.attrib.get("RefTyp", 0)), r.attrib.get("Info", "")))
+        for r in refs
+        if int(r.attrib.get("StrElement", 0)) in elemente
+    )
+
+# -----
+# Graph-Export
+# -----
+
+def str_knoten_id(modul, nr, richtung):
+    return "{}:{}{}".format(modul, nr, 'n' if richtung == NORM else 'g')
+
+def get_topologie(modul, elemente):
+    """
+    Gibt die Nachfolger der <StrElement>-Knoten elemente des (normalisierten) Moduls modul zurueck:
+    Elementnummer -> (Nachfolger in Normrichtung, Nachfolger in Gegenrichtung), jeweils in der Reihenfolge von nachfolger().
+    Ein Nachfolger ist (modul, Elementnummer, richtung) oder, bei Verweisen auf ein Modul, (Modul, Referenznummer, None).
+    """
+    result = dict()
+    for el in elemente:
+        anschluss = int(el.attrib.get("Anschluss", 0))
+        nachfolger_listen = ([], [])
+        for n in el:
+            if n.tag in ("NachNorm", "NachNormModul"):
+                richtung = NORM
+            elif n.tag in ("NachGegen", "NachGegenModul"):
+                richtung = GEGEN
+            else:
+                continue
+            liste = nachfolger_listen[0 if richtung == NORM else 1]
+            if "Modul" in n.tag:
+                liste.append((get_modul_aus_dateiknoten(n, modul), int(n.attrib.get("Nr", 0)), None))
+            else:
+                anschluss_shift = len(liste) + (8 if richtung == GEGEN else 0)
+                liste.append((modul, int(n.attrib.get("Nr", 0)), NORM if (anschluss >> anschluss_shift) & 1 == 0 else GEGEN))
+        result[int(el.attrib.get("Nr", 0))] = nachfolger_listen
+    return result
+
+def scanne_refpunkte(zusi_relpath):
+    """
+    Gibt die Referenzpunkte eines Moduls (Referenznummer -> (Elementnummer, Richtung)) zurueck, ohne Streckenelemente
+    aufzubauen. Ob die Elemente existieren, wird nicht geprueft.
+    """
+    return dict(
+        (int(r.attrib.get("ReferenzNr", 0)), (int(r.attrib.get("StrElement", 0)), NORM if int(r.attrib.get("StrNorm", 0)) == 1 else GEGEN))
+        for r in scanne_teilbaeume(zusi_relpath, lambda tag, attrib: tag == "ReferenzElemente")
+    )
+
+class Fahrt(object):
+    """
+    Eine Fahrstrasse des Moduls modul, die beim Graph-Export abgefahren wird, gegebenenfalls verteilt auf die
+    Exportdurchlaeufe mehrerer Module. Start, Ziel und Weichen sind als (Modul, Referenznummer) gespeichert.
+    """
+    def __init__(self, modul, f):
+        self.modul = modul
+        self.name = f.attrib.get("FahrstrName", "")
+        self.typ = f.attrib.get("FahrstrTyp", "")
+        startknoten = f.find("./FahrstrStart")
+        self.start = (get_modul_aus_dateiknoten(startknoten, modul), int(startknoten.attrib.get("Ref", 0)))
+        zielknoten = f.find("./FahrstrZiel")
+        self.ziel = (get_modul_aus_dateiknoten(zielknoten, modul), int(zielknoten.attrib.get("Ref", 0)))
+        self.weichen = [((get_modul_aus_dateiknoten(weiche, modul), int(weiche.attrib.get("Ref", 0))), int(weiche.attrib.get("FahrstrWeichenlage", 0)) - 1)
+            for weiche in f.findall("./FahrstrWeiche")]
+        self.knoten_ids = []
+        self.besucht = set()
+        self.ziel_erreicht = False
+
+class CsvGraphAusgabe(object):
+    """
+    Schreibt den Graphen als Tabellen knoten.csv, kanten.csv und fahrstrassen.csv (eine Zeile pro Knoten
+    einer Fahrstrasse) in das Verzeichnis verzeichnis.
+    """
+    def __init__(self, verzeichnis):
+        import csv
+        os.makedirs(verzeichnis, exist_ok=True)
+        self.dateien = [open(os.path.join(verzeichnis, name), 'w', newline='', encoding='utf-8')
+            for name in ("knoten.csv", "kanten.csv", "fahrstrassen.csv")]
+        (self.knoten_csv, self.kanten_csv, self.fahrstrassen_csv) = [csv.writer(datei) for datei in self.dateien]
+        self.knoten_csv.writerow(["id", "modul", "element", "richtung", "betriebsstelle", "signal", "register", "extern"])
+        self.kanten_csv.writerow(["von", "nach", "index", "modulgrenze"])
+        self.fahrstrassen_csv.writerow(["modul", "fahrstrasse", "typ", "position", "knoten"])
+
+    def knoten(self, knoten_id, modul, nr, richtung, betriebsstelle, signal, register, extern):
+        self.knoten_csv.writerow([knoten_id, modul, nr, richtung, betriebsstelle, signal, register, 1 if extern else 0])
+
+    def kante(self, von, nach, index, modulgrenze):
+        self.kanten_csv.writerow([von, nach, index, 1 if modulgrenze else 0])
+
+    def fahrstrasse(self, modul, name, typ, knoten_ids):
+        for position, knoten_id in enumerate(knoten_ids):
+            self.fahrstrassen_csv.writerow([modul, name, typ, position, knoten_id])
+
+    def close(self):
+        for datei in self.dateien:
+            datei.close()
+
+class GraphmlAusgabe(object):
+    """
+    Schreibt den Graphen als GraphML nach out. Fahrstrassen werden als zusaetzliche Kanten mit typ="fahrstrasse"
+    zwischen aufeinanderfolgenden Knoten der Fahrstrasse ausgegeben (Gleiskanten haben typ="gleis").
+    """
+    KNOTEN_ATTRIBUTE = ["modul", "element", "richtung", "betriebsstelle", "signal", "register", "extern"]
+    KANTEN_ATTRIBUTE = ["typ", "index", "modulgrenze", "fahrstrasse", "position"]
+
+    def __init__(self, out):
+        from xml.sax.saxutils import escape, quoteattr
+        self.escape = escape
+        self.quoteattr = quoteattr
+        self.out = out
+        print('<?xml version="1.0" encoding="UTF-8"?>', file=out)
+        print('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">', file=out)
+        for name in self.KNOTEN_ATTRIBUTE:
+            print('  <key id="{0}" for="node" attr.name="{0}" attr.type="string"/>'.format(name), file=out)
+        for name in self.KANTEN_ATTRIBUTE:
+            print('  <key id="{0}" for="edge" attr.name="{0}" attr.type="string"/>'.format(name), file=out)
+        print('  <graph id="G" edgedefault="directed">', file=out)
+
+    def daten(self, attribute):
+        return "".join('<data key="{}">{}</data>'.format(key, self.escape(str(wert))) for (key, wert) in attribute if wert != "")
+
+    def knoten(self, knoten_id, modul, nr, richtung, betriebsstelle, signal, register, extern):
+        print('    <node id={}>{}</node>'.format(self.quoteattr(knoten_id),
+            self.daten(zip(self.KNOTEN_ATTRIBUTE, [modul, nr, richtung, betriebsstelle, signal, register, 1 if extern else 0]))), file=self.out)
+
+    def kante(self, von, nach, index, modulgrenze):
+        print('    <edge source={} target={}>{}</edge>'.format(self.quoteattr(von), self.quoteattr(nach),
+            self.daten([("typ", "gleis"), ("index", index), ("modulgrenze", 1 if modulgrenze else 0)])), file=self.out)
+
+    def fahrstrasse(self, modul, name, typ, knoten_ids):
+        for position in range(len(knoten_ids) - 1):
+            print('    <edge source={} target={}>{}</edge>'.format(self.quoteattr(knoten_ids[position]), self.quoteattr(knoten_ids[position + 1]),
+                self.daten([("typ", "fahrstrasse"), ("fahrstrasse", name), ("position", position)])), file=self.out)
+
+    def close(self):
+        print('  </graph>', file=self.out)
+        print('</graphml>', file=self.out)
+
+def entlade_module():
+    streckenelemente.clear()
+    referenzpunkte.clear()
+    fahrstrassen.clear()
+    nachbarmodule.clear()
+    signalbild_bits.clear()
+
+class GraphExport(object):
+    """
+    Exportiert Module nacheinander nach ausgabe (siehe graph_exportieren). Verweise in andere Module werden als
+    (Modul, Referenznummer) vorgemerkt und im Exportdurchlauf des Zielmoduls aufgeloest; dafuer werden nur die
+    Referenzpunkte der exportierten Module aufbewahrt.
+    """
+    def __init__(self, ausgabe):
+        self.ausgabe = ausgabe
+        # Modul -> Referenznummer -> (Elementnummer, Richtung)
+        self.refpunkte = dict()
+        # Normalisierte Namen der exportierten Module
+        self.exportiert = set()
+        # Modul und Nachfolger des gerade exportierten Moduls
+        self.modul = None
+        self.topologie = None
+        # Zielmodul -> [(Modul, Knoten-ID, Referenznummer, Index)] fuer Kanten in noch nicht exportierte Module
+        self.offene_kanten = defaultdict(list)
+        # Modul -> [(Fahrt, Referenznummer, umkehren)] fuer Fahrstrassen, die in einem noch nicht exportierten
+        # bzw. (nachzuholen) einem bereits exportierten Modul weiterfuehren
+        self.offene_fahrten = defaultdict(list)
+        self.nachzuholen = defaultdict(list)
+        # Modul -> [Fahrt] fuer Fahrstrassen, deren Zielpunkt noch nicht aufgeloest werden kann
+        self.offene_ziele = defaultdict(list)
+        # Knoten-ID -> (Modul, Elementnummer, Richtung) fuer Knoten in nicht exportierten Modulen
+        self.fremde_knoten = dict()
+
+    def refpunkt(self, modul, refnr):
+        r = self.refpunkte[modul].get(refnr)
+        return None if r is None else (modul, r[0], r[1])
+
+    def knoten_id(self, el_r):
+        knoten_id = str_knoten_id(*el_r)
+        if el_r[0] not in self.exportiert:
+            self.fremde_knoten[knoten_id] = el_r
+        return knoten_id
+
+    def modul_exportieren(self, modul):
+        """
+        Exportiert das geladene Modul modul samt der Kanten und Fahrstrassen anderer Module, die hierher fuehren.
+        """
+        m = normalize_zusi_relpath(modul)
+        self.exportiert.add(m)
+        self.refpunkte[m] = dict((refnr, (int(r[0].attrib.get("Nr", 0)), r[1])) for (refnr, r) in referenzpunkte[modul].items())
+        self.modul = m
+        self.topologie = get_topologie(m, streckenelemente[modul].values())
+
+        for nr, el in streckenelemente[modul].items():
+            for richtung in (NORM, GEGEN):
+                info = el.find("./Info" + ("Norm" if richtung == NORM else "Gegen") + "Richtung")
+                signal = None if info is None else info.find("./Signal")
+                von = str_knoten_id(m, nr, richtung)
+                self.ausgabe.knoten(von, m, nr, 'n' if richtung == NORM else 'g',
+                    "" if signal is None else signal.attrib.get("NameBetriebsstelle", ""),
+                    "" if signal is None else signal.attrib.get("Signalname", ""),
+                    "" if info is None else info.attrib.get("Reg", ""),
+                    False)
+
+                for index, nach in enumerate(self.topologie[nr][0 if richtung == NORM else 1]):
+                    if nach[2] is None:
+                        self.offene_kanten[nach[0]].append((m, von, nach[1], index))
+                    elif nach[1] in self.topologie:
+                        self.ausgabe.kante(von, str_knoten_id(*nach), index, False)
+
+        self.offenes_aufloesen(m)
+        for f in fahrstrassen[modul]:
+            fahrt = Fahrt(m, f)
+            self.weiterfahren(fahrt, fahrt.start[0], fahrt.start[1], False)
+
+    def offenes_aufloesen(self, m):
+        """
+        Gibt die vorgemerkten Kanten und Fahrstrassen mit Ziel im Modul m aus, dessen Referenzpunkte bekannt sind.
+        """
+        for (von_modul, von, refnr, index) in self.offene_kanten.pop(m, []):
+            nach = self.refpunkt(m, refnr)
+            if nach is not None:
+                self.ausgabe.kante(von, self.knoten_id(gegen(nach)), index, von_modul != m)
+        for (fahrt, refnr, umkehren) in self.offene_fahrten.pop(m, []):
+            self.weiterfahren(fahrt, m, refnr, umkehren)
+        for fahrt in self.offene_ziele.pop(m, []):
+            self.fahrt_beenden(fahrt)
+
+    def weiterfahren(self, fahrt, modul, refnr, umkehren):
+        """
+        Setzt fahrt am Referenzpunkt refnr im Modul modul fort (umkehren: entgegen der Richtung des Referenzpunkts),
+        sofort, wenn modul gerade exportiert wird, sonst im Durchlauf von modul bzw. am Ende des Exports.
+        """
+        if modul == self.modul:
+            self.fahren(fahrt, modul, refnr, umkehren)
+        elif modul in self.exportiert:
+            self.nachzuholen[modul].append((fahrt, refnr, umkehren))
+        elif modul in self.refpunkte:
+            # Nicht exportiertes Modul: Die Fahrstrasse endet an einem Platzhalterknoten.
+            akt = self.refpunkt(modul, refnr)
+            if akt is not None:
+                akt = gegen(akt) if umkehren else akt
+                fahrt.knoten_ids.append(self.knoten_id(akt))
+                fahrt.ziel_erreicht = fahrt.ziel[0] == modul and akt == self.refpunkt(*fahrt.ziel)
+            self.fahrt_beenden(fahrt)
+        else:
+            self.offene_fahrten[modul].append((fahrt, refnr, umkehren))
+
+    def fahren(self, fahrt, modul, refnr, umkehren):
+        """
+        Faehrt fahrt ab dem Referenzpunkt refnr entlang self.topologie ab, bis das Ziel, ein Ende oder eine
+        Modulgrenze erreicht ist (vgl. get_fahrstrasse_weg).
+        """
+        akt = self.refpunkt(modul, refnr)
+        if akt is None:
+            return self.fahrt_beenden(fahrt)
+        akt = gegen(akt) if umkehren else akt
+
+        weichen = dict()
+        for ((weichenmodul, weichenref), weichenlage) in fahrt.weichen:
+            if weichenmodul == modul and weichenref in self.refpunkte[modul]:
+                weichen[self.refpunkt(weichenmodul, weichenref)] = weichenlage
+        ziel = self.refpunkt(*fahrt.ziel) if fahrt.ziel[0] == modul else None
+
+        while akt not in fahrt.besucht and akt[1] in self.topologie:
+            fahrt.besucht.add(akt)
+            fahrt.knoten_ids.append(str_knoten_id(*akt))
+            if akt == ziel:
+                fahrt.ziel_erreicht = True
+                break
+            nachfolger_liste = self.topologie[akt[1]][0 if akt[2] == NORM else 1]
+            index = weichen.get(akt, 0)
+            if index >= len(nachfolger_liste):
+                break
+            nach = nachfolger_liste[index]
+            if nach[2] is None:
+                if nach[0] != modul:
+                    return self.weiterfahren(fahrt, nach[0], nach[1], True)
+                nach = self.refpunkt(modul, nach[1])
+                if nach is None:
+                    break
+                nach = gegen(nach)
+            akt = nach
+        self.fahrt_beenden(fahrt)
+
+    def fahrt_beenden(self, fahrt):
+        """
+        Gibt fahrt aus. Wurde das Ziel nicht erreicht, wird der Weg nur ausgegeben, wenn der Zielpunkt existiert
+        (vgl. get_fahrstrasse_weg); das wird bis zum Durchlauf des Zielmoduls zurueckgestellt.
+        """
+        if not fahrt.ziel_erreicht and len(fahrt.knoten_ids):
+            if fahrt.ziel[0] not in self.refpunkte:
+                self.offene_ziele[fahrt.ziel[0]].append(fahrt)
+                return
+            if self.refpunkt(*fahrt.ziel) is None:
+                fahrt.knoten_ids = []
+        self.ausgabe.fahrstrasse(fahrt.modul, fahrt.name, fahrt.typ, fahrt.knoten_ids)
+
+    def abschliessen(self):
+        """
+        Faehrt Fahrstrassen zu Ende, die in bereits exportierte Module zurueckfuehren (dafuer werden nur deren
+        Streckenelemente erneut gelesen), und loest Verweise in nicht exportierte Module ueber deren Referenzpunkte
+        auf. Anschliessend werden die Platzhalterknoten ausgegeben.
+        """
+        while len(self.nachzuholen):
+            (m, fortsetzungen) = self.nachzuholen.popitem()
+            logging.debug("Lese Streckenelemente von {} erneut fuer {} Fahrstrasse(n)".format(m, len(fortsetzungen)))
+            self.modul = m
+            self.topologie = get_topologie(m, scanne_teilbaeume(m, lambda tag, attrib: tag == "StrElement"))
+            for (fahrt, refnr, umkehren) in fortsetzungen:
+                self.fahren(fahrt, m, refnr, umkehren)
+        self.modul = None
+        self.topologie = None
+
+        while len(self.offene_kanten) or len(self.offene_fahrten) or len(self.offene_ziele):
+            m = next(iter(set(self.offene_kanten) | set(self.offene_fahrten) | set(self.offene_ziele)))
+            if m not in self.refpunkte:
+                try:
+                    self.refpunkte[m] = scanne_refpunkte(m)
+                except FileNotFoundError:
+                    self.refpunkte[m] = dict()
+            self.offenes_aufloesen(m)
+
+        for knoten_id, (modul, nr, richtung) in self.fremde_knoten.items():
+            self.ausgabe.knoten(knoten_id, modul, nr, 'n' if richtung == NORM else 'g', "", "", "", True)
+
+def graph_exportieren(startmodul, nachbarn, ausgabe):
+    """
+    Exportiert den Streckengraphen von startmodul und (bis zu nachbarn Stufen, -1 = alle erreichbaren) seiner
+    Nachbarmodule nach ausgabe. Knoten sind Streckenelemente in einer Richtung, Kanten die Nachfolger laut nachfolger().
+    Jedes Modul wird genau einmal geladen, exportiert und wieder verworfen; Nachbarmodule werden dabei nicht geladen
+    (siehe GraphExport). Kanten und Fahrstrassen, die in nicht exportierte Module fuehren, enden an Platzhalterknoten
+    mit extern=1, die am Ende ausgegeben werden.
+    """
+    export = GraphExport(ausgabe)
+    warteschlange = deque([(startmodul, 0)])
+    gesehen = set([normalize_zusi_relpath(startmodul)])
+
+    while len(warteschlange):
+        (modul, stufe) = warteschlange.popleft()
+        logging.debug("Exportiere {}".format(modul))
+        try:
+            lade_modul(modul)
+        except FileNotFoundError:
+            logging.warning("Modul {} nicht gefunden".format(modul))
+            continue
+
+        if nachbarn < 0 or stufe < nachbarn:
+            for m in nachbarmodule[modul]:
+                if m not in gesehen:
+                    gesehen.add(m)
+                    warteschlange.append((m, stufe + 1))
+
+        export.modul_exportieren(modul)
+        entlade_module()
+
+    export.abschliessen()
+
+# -----
+# Server
+# -----
+
+def get_fahrstrassen_nach_name(name):
+    return [f for f in fahrstrassen[dieses_modul] if f.attrib.get("FahrstrName", "") == name]
+
+def server_anfrage_bearbeiten(methode, params):
+    """
+    Beantwortet eine Server-Anfrage. Laeuft im Executor des Servers, nicht in der Ereignisschleife.
+    """
+    if methode == 'fahrstrassen_an_signal':
+        result = []
+        for rp in get_signal_refpunkte(params.get("signal")):
+            (hsig_fahrstrassen, vsig_fahrstrassen) = get_fahrstrassen_an_signal(rp)
+            result.append({
+                "signal": "{} {}".format(rp.signal().attrib.get("NameBetriebsstelle", "?"), rp.signal().attrib.get("Signalname", "?")),
+                "refpunkt": repr(rp),
+                "hsig": sorted(f.attrib.get("FahrstrName", "") for f in hsig_fahrstrassen),
+                "vsig": sorted(f.attrib.get("FahrstrName", "") for f in vsig_fahrstrassen),
+            })
+        return result
+
+    if methode == 'an_signal':
+        with io.StringIO() as out:
+            for rp in get_signal_refpunkte(params.get("signal")):
+                an_signal_ausgeben(rp, out)
+            return out.getvalue()
+
+    if methode == 'elemente':
+        return [[str_el_ri(*el_r) for el_r in get_fahrstrasse_elemente(f)]
+            for f in get_fahrstrassen_nach_name(params.get("fahrstrasse"))]
+
+    if methode == 'fahrstrasse':
+        return [fahrstrasse_bericht(f)[1] for f in get_fahrstrassen_nach_name(params.get("fahrstrasse"))]
+
+    raise ValueError("Unbekannte Methode '{}'".format(methode))
+
+def perzentil(werte_sortiert, p):
+    if len(werte_sortiert) == 0:
+        return None
+    return werte_sortiert[int(round(p * (len(werte_sortiert) - 1)))]
+
+class Server(object):
+    """
+    JSON-RPC-Server (ein JSON-Objekt pro Zeile) ueber TCP, der die geladenen Module im Speicher haelt.
+
+    Die Auswertungen laufen nacheinander in einem Thread-Executor, da sie sich die Modul-Caches teilen.
+    Gleiche gleichzeitige Anfragen werden nur einmal berechnet. Sind max_anfragen Anfragen in Bearbeitung,
+    werden keine weiteren Anfragen mehr gelesen, bis wieder eine fertig ist.
+    """
+    def __init__(self, max_anfragen):
+        import concurrent.futures
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.max_anfragen = max_anfragen
+        # (methode, params) -> asyncio.Future
+        self.laufend = {}
+        # Antwortzeiten erfolgreicher Anfragen in Sekunden
+        self.latenzen = deque(maxlen=100000)
+
+    def statistik(self):
+        latenzen = sorted(self.latenzen)
+        return {
+            "anzahl": len(latenzen),
+            "p50_ms": None if len(latenzen) == 0 else perzentil(latenzen, 0.5) * 1000,
+            "p99_ms": None if len(latenzen) == 0 else perzentil(latenzen, 0.99) * 1000,
+        }
+
+    async def bearbeiten(self, methode, params):
+        import asyncio
+        import json
+        if methode == 'statistik':
+            return self.statistik()
+
+        key = (methode, json.dumps(params, sort_keys=True))
+        future = self.laufend.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, server_anfrage_bearbeiten, methode, params)
+            self.laufend[key] = future
+            future.add_done_callback(lambda _: self.laufend.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def antworten(self, antwort, writer, schreib_lock):
+        import json
+        async with schreib_lock:
+            writer.write((json.dumps(antwort) + "\n").encode("utf-8"))
+            await writer.drain()
+
+    async def anfrage(self, zeile, writer, schreib_lock):
+        import json
+        import time
+        start = time.perf_counter()
+        anfrage_id = None
+        try:
+            anfrage = json.loads(zeile)
+            anfrage_id = anfrage.get("id")
+            methode = anfrage.get("method", "")
+            result = await self.bearbeiten(methode, anfrage.get("params", {}))
+            antwort = {"jsonrpc": "2.0", "id": anfrage_id, "result": result}
+            # Nur erfolgreiche Auswertungen gehen in die Statistik ein, nicht die Statistik-Abfragen selbst
+            if methode != 'statistik':
+                self.latenzen.append(time.perf_counter() - start)
+        except Exception as e:
+            antwort = {"jsonrpc": "2.0", "id": anfrage_id, "error": {"code": -32000, "message": str(e)}}
+
+        await self.antworten(antwort, writer, schreib_lock)
+
+    async def verbindung(self, reader, writer):
+        import asyncio
+        schreib_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    zeile = await reader.readline()
+                except ValueError as e:
+                    # Zeile laenger als das Puffer-Limit; der Rest der Verbindung ist nicht mehr sinnvoll lesbar
+                    await self.antworten({"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": str(e)}}, writer, schreib_lock)
+                    break
+                if not zeile:
+                    break
+
+                # Erst nach dem Lesen einer Anfrage einen Platz belegen, damit wartende Verbindungen keinen blockieren.
+                # Solange alle Plaetze belegt sind, wird von dieser Verbindung nichts weiter gelesen.
+                await self.freie_anfragen.acquire()
+                task = None
+                try:
+                    task = asyncio.ensure_future(self.anfrage(zeile, writer, schreib_lock))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                    task.add_done_callback(lambda _: self.freie_anfragen.release())
+                finally:
+                    if task is None:
+                        self.freie_anfragen.release()
+            if tasks:
+                await asyncio.wait(tasks)
+        except (asyncio.CancelledError, ConnectionError):
+            # Server wird beendet oder Client hat die Verbindung abgebrochen
+            for task in tasks:
+                task.cancel()
+        finally:
+            writer.close()
+
+    async def laufen(self, host, port):
+        import asyncio
+        self.freie_anfragen = asyncio.Semaphore(self.max_anfragen)
+        server = await asyncio.start_server(self.verbindung, host, port)
+        logging.info("Server laeuft auf {}:{}".format(host, port))
+        async with server:
+            await server.serve_forever()
+
+def server_starten(port, max_anfragen):
+    import asyncio
+    lade_nachbarmodule(dieses_modul)
+    server = Server(max_anfragen)
+    try:
+        asyncio.run(server.laufen('127.0.0.1', port))
+    except KeyboardInterrupt:
+        pass
+    statistik = server.statistik()
+    if statistik["anzahl"] > 0:
+        print("{} Anfrage(n), Antwortzeit p50 {:.1f} ms, p99 {:.1f} ms".format(statistik["anzahl"], statistik["p50_ms"], statistik["p99_ms"]), file=sys.stderr)
+
+# -----
+# main
+# -----
+
+def main():
+    global args, dieses_modul, colored
+
+    parser = argparse.ArgumentParser(description='Liste von Fahrstrassen in einem Zusi-3-Modul, sowie andere Helferfunktionen.')
+    parser.add_argument('dateiname')
+    parser.add_argument('--modus', default='fahrstrassen', help='Modus. Moegliche Werte sind: "fahrstrassen" -- gib eine Liste von Fahrstrassen aus. "an_signal" -- gib eine Liste von Fahrstrassenkombinationen am angegebenen Signal (--signal) aus. "graph" -- exportiere den Streckengraphen dieses Moduls und seiner Nachbarmodule (siehe --nachbarn, --format, --ausgabe). "konflikte" -- gib die Konflikte (gemeinsame Elemente, Gegenrichtung, unterschiedliche Weichenlagen) zwischen den Fahrstrassen als duenn besetzte Matrix aus (siehe --format). "liste" -- gib nur die Kopfzeilen der Fahrstrassen aus, ohne Nachbarmodule zu laden (siehe --filter, --anzahl, --details). "refpunkte" -- vergleiche generierte und tatsaechliche Namen von Signal-Referenzpunkten. "server" -- beantworte Anfragen (JSON-RPC, eine Anfrage pro Zeile) auf --port; Methoden: "fahrstrassen_an_signal", "an_signal" (Parameter "signal"), "elemente", "fahrstrasse" (Parameter "fahrstrasse"), "statistik".')
+    parser.add_argument('--sortiert', action='store_true', help="Sortiere Fahrstrassen nach Namen")
+    parser.add_argument('--register', action='store_true', help="Gib auch Register in Fahrstrassen aus")
+    parser.add_argument('--weichen', action='store_true', help="Gib auch Weichen in Fahrstrassen aus")
+    parser.add_argument('--bue', action='store_true', help="Gib auch Bahnuebergangsereignisse in Fahrstrassen aus")
+    parser.add_argument('--hsig-ausserhalb-fahrstrasse',  default='ignorieren', choices=['ignorieren', 'ausgeben', 'ausgeben_exkl'], help="Fahrstrassen markieren oder ausgeben, bei denen ein Hauptsignal ausserhalb der Fahrstrasse liegt")
+    parser.add_argument('--vsig-geschw', default='ignorieren', choices=['ignorieren', 'ausgeben', 'ausgeben_exkl'], help="Fahrstrassen markieren oder ausgeben, bei denen ein Vorsignal eine hoehere Geschwindigkeit anzeigt als das Hauptsignal mit der niedrigsten Geschwindigkeit in der Fahrstrasse")
+    parser.add_argument('--signal', action='store', help="Signalbezeichnung (z.B. \"S3\") fuer modus=an_signal")
+    parser.add_argument('--format', default='csv', choices=['csv', 'json', 'graphml'], help="Ausgabeformat fuer modus=konflikte (csv, json) und modus=graph (csv, graphml)")
+    parser.add_argument('--ausgabe', action='store', help="Ausgabeverzeichnis (--format=csv) bzw. -datei (--format=graphml, sonst Standardausgabe) fuer modus=graph")
+    parser.add_argument('--nachbarn', type=int, default=0, help="Anzahl Stufen von Nachbarmodulen, die in modus=graph mit exportiert werden (-1 = alle erreichbaren Module). Kanten und Fahrstrassen in nicht exportierte Module enden an Platzhalterknoten mit extern=1.")
+    parser.add_argument('--filter', action='store', help="Nur Fahrstrassen, deren Name oder Start-/Zielsignal diesen Text enthaelt, fuer modus=liste")
+    parser.add_argument('--anzahl', type=int, help="Hoechstens so viele Fahrstrassen ausgeben fuer modus=liste")
+    parser.add_argument('--details', action='store_true', help="Gefundene Fahrstrassen vollstaendig ausgeben (wie modus=fahrstrassen) fuer modus=liste")
+    parser.add_argument('--jobs', type=int, default=1, help="Anzahl Prozesse fuer die Auswertung der Fahrstrassen in modus=fahrstrassen")
+    parser.add_argument('--port', type=int, default=7353, help="TCP-Port (nur localhost) fuer modus=server")
+    parser.add_argument('--max-anfragen', type=int, default=64, help="Maximale Anzahl gleichzeitig bearbeiteter Anfragen fuer modus=server")
+
+    args = parser.parse_args()
+
+    if sys.stdout.isatty() and args.modus != 'server':
+        try:
+            from termcolor import colored
+        except ImportError:
+            pass
+
+    dieses_modul = get_zusi_relpath(os.path.realpath(args.dateiname))
+    logging.debug("Dieses Modul: {} -> {}".format(args.dateiname, dieses_modul))
+
+    if args.modus == 'konflikte' and args.format == 'graphml':
+        parser.error("--format=graphml wird nur fuer modus=graph unterstuetzt")
+    if args.modus == 'graph' and args.format == 'json':
+        parser.error("--format=json wird fuer modus=graph nicht unterstuetzt")
+    if args.modus == 'graph' and args.format == 'csv' and args.ausgabe is None:
+        parser.error("modus=graph mit --format=csv benoetigt --ausgabe")
+
+    # modus=liste und modus=refpunkte lesen nur die benoetigten Teile des Moduls, modus=graph laedt die Module selbst
+    if args.modus not in ('liste', 'refpunkte', 'graph'):
+        lade_modul(dieses_modul)
+        logging.debug("{} Referenzpunkt(e), {} Fahrstrasse(n)".format(len(referenzpunkte[dieses_modul]), len(fahrstrassen[dieses_modul])))
+
+    if args.modus == 'refpunkte':
+      for refnr, (element, richtung, reftyp, info) in lade_signal_refpunkte(dieses_modul).items():
+        if reftyp == 4:
+            sig = element.find("./Info" + ("Norm" if richtung == NORM else "Gegen") + "Richtung/Signal")
+            if sig is not None:
+                info_soll = 'Signal: {} {}'.format(sig.attrib.get("NameBetriebsstelle", ""), sig.attrib.get("Signalname", ""))
+                if info != info_soll:
+                    print("Referenzpunkt {}: ist '{}', soll '{}'".format(refnr, info, info_soll))
+
+    if args.modus == 'an_signal':
+        lade_nachbarmodule(dieses_modul)
+
+        refpunkte = get_signal_refpunkte(args.signal)
+
+        if len(refpunkte) == 0:
+            print("Keine Referenzpunkte fuer Signal '{}' gefunden".format(args.signal))
+        else:
+            for rp in refpunkte:
+                an_signal_ausgeben(rp, sys.stdout)
+
+    if args.modus == 'konflikte':
+        if args.sortiert:
+            fahrstrassen[dieses_modul].sort(key = lambda f: f.attrib.get("FahrstrName", ""))
+        (konflikte, nicht_aufloesbar) = get_konflikte(fahrstrassen[dieses_modul])
+        konflikte_ausgeben(fahrstrassen[dieses_modul], konflikte, nicht_aufloesbar, args.format, sys.stdout)
+
+    if args.modus == 'graph':
+        if args.format == 'csv':
+            ausgabe = CsvGraphAusgabe(args.ausgabe)
+            graph_exportieren(dieses_modul, args.nachbarn, ausgabe)
+            ausgabe.close()
+        elif args.ausgabe is None:
+            ausgabe = GraphmlAusgabe(sys.stdout)
+            graph_exportieren(dieses_modul, args.nachbarn, ausgabe)
+            ausgabe.close()
+        else:
+            with open(args.ausgabe, 'w', encoding='utf-8') as out:
+                ausgabe = GraphmlAusgabe(out)
+                graph_exportieren(dieses_modul, args.nachbarn, ausgabe)
+                ausgabe.close()
+
+    if args.modus == 'liste':
+        treffer = scanne_fahrstrassen(dieses_modul, args.filter)
+        if args.sortiert:
+            treffer = sorted(treffer, key = lambda f: f.attrib.get("FahrstrName", ""))
+        anz = 0
+        for f in treffer:
+            if args.anzahl is not None and anz >= args.anzahl:
+                break
+            if args.details:
+                if dieses_modul not in fahrstrassen:
+                    lade_modul(dieses_modul)
+                (print_out, text) = fahrstrasse_bericht(f)
+                if print_out:
+                    print(text)
+                    anz += 1
+            else:
+                print(str_fahrstrasse_kopf(f))
+                anz += 1
+
+    if args.modus == 'fahrstrassen':
+      if args.sortiert:
+        fahrstrassen[dieses_modul].sort(key = lambda f: f.attrib.get("FahrstrName", ""))
+      for (print_out, text) in fahrstrassen_berichte(fahrstrassen[dieses_modul], args.jobs):
+        if print_out:
+            print(text)
+
+    if args.modus == 'server':
+        server_starten(args.port, args.max_anfragen)